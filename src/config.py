@@ -44,6 +44,11 @@ class Config:
     LLM_MODEL: str = "openai/gpt-3.5-turbo"
     EMBEDDING_MODEL: str = "openai/text-embedding-ada-002"
 
+    # Retries for rate limits (429), server errors and dropped connections
+    # in batch tagging; the OpenAI client backs off exponentially and honours
+    # Retry-After. Interactive chat keeps the SDK default so it fails fast.
+    TAG_MAX_RETRIES: int = 5
+
     # Pinecone Configuration
     PINECONE_API_KEY: str = None
     PINECONE_INDEX_NAME: str = "gitabae"
@@ -60,6 +65,7 @@ class Config:
         cls.PINECONE_INDEX_NAME = get_env("PINECONE_INDEX_NAME", "gitabae")
         cls.LLM_MODEL = get_env("LLM_MODEL", "openai/gpt-3.5-turbo")
         cls.EMBEDDING_MODEL = get_env("EMBEDDING_MODEL", "openai/text-embedding-ada-002")
+        cls.TAG_MAX_RETRIES = int(get_env("TAG_MAX_RETRIES", "5"))
         return cls
 
     @classmethod
@@ -80,18 +86,47 @@ class Config:
         return True
 
 
-def get_openai_client():
+def get_openai_client(max_retries: int = None):
     """
     Get OpenAI client configured for OpenRouter.
     Uses OpenRouter as a proxy to access OpenAI models.
+
+    Args:
+        max_retries: Retry count for transient errors (default: SDK default)
     """
-    from openai import OpenAI
+    from openai import OpenAI, DEFAULT_MAX_RETRIES
 
     Config.load()
 
     client = OpenAI(
         api_key=Config.OPENROUTER_API_KEY,
         base_url=Config.OPENROUTER_BASE_URL,
+        max_retries=DEFAULT_MAX_RETRIES if max_retries is None else max_retries,
+        default_headers={
+            "HTTP-Referer": Config.APP_URL,
+            "X-Title": Config.APP_NAME,
+        }
+    )
+
+    return client
+
+
+def get_async_openai_client(max_retries: int = None):
+    """
+    Get async OpenAI client configured for OpenRouter.
+    Used for concurrent requests in batch jobs such as verse tagging.
+
+    Args:
+        max_retries: Retry count for transient errors (default: SDK default)
+    """
+    from openai import AsyncOpenAI, DEFAULT_MAX_RETRIES
+
+    Config.load()
+
+    client = AsyncOpenAI(
+        api_key=Config.OPENROUTER_API_KEY,
+        base_url=Config.OPENROUTER_BASE_URL,
+        max_retries=DEFAULT_MAX_RETRIES if max_retries is None else max_retries,
         default_headers={
             "HTTP-Referer": Config.APP_URL,
             "X-Title": Config.APP_NAME,
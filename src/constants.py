@@ -24,6 +24,7 @@ APP_URL = "https://gitabae.streamlit.app"
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 FEEDBACK_FILE = DATA_DIR / "feedback_log.json"
+TAG_CACHE_FILE = DATA_DIR / ".tag_cache.json"
 
 
 def get_chapter_data_path(chapter: int) -> Path:
@@ -197,8 +197,9 @@ def generate_embeddings_from_file(
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
+    # Compact separators: indenting 1536 floats per vector doubles write time
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+        json.dump(output_data, f, ensure_ascii=False, separators=(",", ":"))
 
     logger.info(f"Saved {len(embedded_verses)} embeddings to {output_path}")
     logger.info(f"Embedding dimensions: {output_data['metadata']['dimensions']}")
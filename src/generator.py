@@ -116,13 +116,10 @@ class ResponseGenerator:
 
         logger.info(f"Generating response for query: {user_query[:50]}...")
 
-        # Sanitize input
-        sanitized_query = self.safety.sanitize_input(user_query)
+        # Sanitize and check input safety
+        sanitized_query, safety_result = self.safety.process(user_query)
 
-        # Check input safety
-        safety_result = self.safety.check_input(sanitized_query)
-
-        if safety_result.status == SafetyStatus.BLOCKED:
+        if safety_result.status is SafetyStatus.BLOCKED:
             logger.warning(f"Query blocked: {safety_result.reason}")
             return {
                 "response": BLOCKED_INPUT_MESSAGE,
@@ -131,7 +128,7 @@ class ResponseGenerator:
                 "safety_status": "blocked"
             }
 
-        if safety_result.status == SafetyStatus.REDIRECT:
+        if safety_result.status is SafetyStatus.REDIRECT:
             logger.info(f"Query redirected: {safety_result.reason}")
             return {
                 "response": safety_result.redirect_message,
@@ -176,7 +173,7 @@ class ResponseGenerator:
 
         # Check output safety
         output_safety = self.safety.check_output(response)
-        if output_safety.status == SafetyStatus.BLOCKED:
+        if output_safety.status is SafetyStatus.BLOCKED:
             logger.warning("Generated response blocked by safety check")
             response = GENERATION_ERROR_MESSAGE
 
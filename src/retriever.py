@@ -6,11 +6,12 @@ Retrieves relevant verses from the vector store based on user queries.
 """
 
 import json
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import FrozenSet, List, Optional, Union
 
-from .vectorstore import VectorStore
+from .vectorstore import get_vectorstore
 from .config import Config
 from .constants import get_chapter_data_path
 from .logger import get_retriever_logger
@@ -18,7 +19,7 @@ from .logger import get_retriever_logger
 logger = get_retriever_logger()
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievedVerse:
     """A retrieved verse with full content and relevance score."""
     chapter: int
@@ -28,6 +29,12 @@ class RetrievedVerse:
     commentary: str
     tags: List[str]
     score: float
+    # Lowercased tags for membership checks; derived from tags if not given
+    tag_set: Optional[FrozenSet[str]] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.tag_set is None:
+            self.tag_set = frozenset(tag.lower() for tag in self.tags)
 
     def to_context(self, include_commentary: bool = True) -> str:
         """Format verse as context for LLM."""
@@ -56,7 +63,7 @@ class Retriever:
             chapter: Chapter number to load (used if data_path not provided)
         """
         Config.load()
-        self.vector_store = VectorStore()
+        self.vector_store = get_vectorstore()
 
         # Use provided path or get from constants
         if data_path is None:
@@ -78,9 +85,11 @@ class Retriever:
 
         # Index by ID for quick lookup
         verses = {}
-        for verse in data.get('verses', []):
-            verse_id = f"chapter_{verse['chapter']}_verse_{verse['verse']}"
-            verses[verse_id] = verse
+        for verse in data.get('verses', ()):
+            # Tags repeat across verses; intern them so each is stored once
+            verse['tags'] = [sys.intern(tag) for tag in verse.get('tags', ())]
+            verse['_tag_set'] = frozenset(tag.lower() for tag in verse['tags'])
+            verses[f"chapter_{verse['chapter']}_verse_{verse['verse']}"] = verse
 
         logger.debug(f"Loaded {len(verses)} verses from {data_path}")
         return verses
@@ -125,7 +134,8 @@ class Retriever:
                     translation=verse_data['translation'],
                     commentary=verse_data['commentary'],
                     tags=verse_data['tags'],
-                    score=result['score']
+                    score=result['score'],
+                    tag_set=verse_data['_tag_set']
                 ))
 
         logger.info(f"Retrieved {len(retrieved)} verses above threshold {min_score}")
@@ -177,10 +187,11 @@ class Retriever:
             List of verses with matching tag
         """
         logger.info(f"Retrieving verses by tag: {tag}")
+        tag = tag.lower()
         matching = []
 
         for verse_id, verse_data in self.verses_data.items():
-            if tag.lower() in [t.lower() for t in verse_data['tags']]:
+            if tag in verse_data['_tag_set']:
                 matching.append(RetrievedVerse(
                     chapter=verse_data['chapter'],
                     verse=verse_data['verse'],
@@ -188,7 +199,8 @@ class Retriever:
                     translation=verse_data['translation'],
                     commentary=verse_data['commentary'],
                     tags=verse_data['tags'],
-                    score=1.0  # Direct tag match
+                    score=1.0,  # Direct tag match
+                    tag_set=verse_data['_tag_set']
                 ))
 
         logger.info(f"Found {len(matching)} verses with tag '{tag}'")
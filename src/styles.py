@@ -9,7 +9,7 @@ The CSS template uses these variables, so changing a color
 updates it everywhere automatically.
 """
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Dict
 
 
@@ -17,7 +17,7 @@ from typing import Dict
 # COLOR SCHEMES
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class ColorScheme:
     """Color scheme for a theme mode."""
     # Backgrounds
@@ -282,9 +282,9 @@ COMMON_STYLES = """
 # DARK MODE SPECIFIC STYLES
 # =============================================================================
 
-def _get_dark_mode_css(c: ColorScheme) -> str:
-    """Generate dark mode CSS from color scheme."""
-    return f"""
+# Plain str.format templates: {field} names a ColorScheme field and literal
+# CSS braces are doubled. Rendered with format_map in a single pass.
+DARK_MODE_TEMPLATE = """
         /* ===== DARK MODE ===== */
 
         /* Force dark on all main containers */
@@ -297,8 +297,8 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
         [data-testid="stVerticalBlockBorderWrapper"],
         [class*="stAppViewBlockContainer"],
         [class*="block-container"] {{
-            background-color: {c.bg_primary} !important;
-            background: {c.bg_primary} !important;
+            background-color: {bg_primary} !important;
+            background: {bg_primary} !important;
         }}
 
         /* Bottom input area */
@@ -311,22 +311,22 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
         [data-testid="stChatFloatingInputContainer"],
         [class*="ChatInput"],
         [class*="chatInput"] {{
-            background-color: {c.bg_primary} !important;
-            background: {c.bg_primary} !important;
+            background-color: {bg_primary} !important;
+            background: {bg_primary} !important;
         }}
 
         /* Header */
         [data-testid="stHeader"], header, [data-testid="stToolbar"] {{
-            background-color: {c.bg_primary} !important;
-            background: {c.bg_primary} !important;
+            background-color: {bg_primary} !important;
+            background: {bg_primary} !important;
         }}
 
         /* Header text colors */
         .header-title {{
-            color: {c.text_primary} !important;
+            color: {text_primary} !important;
         }}
         .header-subtitle {{
-            color: {c.text_secondary} !important;
+            color: {text_secondary} !important;
         }}
 
         /* Sidebar */
@@ -336,23 +336,23 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
         [data-testid="stSidebarContent"],
         [data-testid="stSidebarUserContent"],
         [data-testid="stSidebarNav"] {{
-            background-color: {c.bg_sidebar} !important;
-            background: {c.bg_sidebar} !important;
+            background-color: {bg_sidebar} !important;
+            background: {bg_sidebar} !important;
         }}
 
         /* Sidebar text */
         section[data-testid="stSidebar"] * {{
-            color: {c.text_primary} !important;
+            color: {text_primary} !important;
         }}
 
         /* Sidebar buttons - modern styling */
         section[data-testid="stSidebar"] button,
         section[data-testid="stSidebar"] .stButton > button,
         section[data-testid="stSidebar"] [data-testid="baseButton-secondary"] {{
-            background-color: {c.bg_button} !important;
-            background: {c.bg_button} !important;
-            color: {c.text_primary} !important;
-            border: 1px solid {c.border} !important;
+            background-color: {bg_button} !important;
+            background: {bg_button} !important;
+            color: {text_primary} !important;
+            border: 1px solid {border} !important;
             border-radius: 8px !important;
             padding: 0.5rem 0.75rem !important;
             min-height: 38px !important;
@@ -363,20 +363,20 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
         }}
         section[data-testid="stSidebar"] button:hover,
         section[data-testid="stSidebar"] .stButton > button:hover {{
-            background-color: {c.bg_button_hover} !important;
-            background: {c.bg_button_hover} !important;
-            border-color: {c.accent} !important;
+            background-color: {bg_button_hover} !important;
+            background: {bg_button_hover} !important;
+            border-color: {accent} !important;
         }}
         section[data-testid="stSidebar"] button p,
         section[data-testid="stSidebar"] button span {{
-            color: {c.text_primary} !important;
+            color: {text_primary} !important;
         }}
 
         /* Chat messages - modern styling */
         [data-testid="stChatMessage"] {{
-            background-color: {c.bg_secondary} !important;
-            background: {c.bg_secondary} !important;
-            border: 1px solid {c.border} !important;
+            background-color: {bg_secondary} !important;
+            background: {bg_secondary} !important;
+            border: 1px solid {border} !important;
             border-radius: 16px !important;
             padding: 1rem !important;
             margin-bottom: 0.75rem !important;
@@ -385,12 +385,12 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
         [data-testid="stChatMessage"] *,
         [data-testid="stChatMessageContent"],
         [data-testid="stChatMessageContent"] * {{
-            color: {c.text_primary} !important;
+            color: {text_primary} !important;
         }}
 
         /* User message specific styling */
         [data-testid="stChatMessage"][data-testid*="user"] {{
-            background: linear-gradient(135deg, {c.bg_secondary} 0%, rgba(237, 137, 54, 0.1) 100%) !important;
+            background: linear-gradient(135deg, {bg_secondary} 0%, rgba(237, 137, 54, 0.1) 100%) !important;
         }}
 
         /* ===== CHAT INPUT - DARK MODE ===== */
@@ -405,25 +405,25 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
         [data-testid="stChatInput"] [class*="st-emotion"],
         [data-testid="stChatInput"] [data-baseweb],
         [data-testid="stChatInput"] [data-baseweb] > div {{
-            background: {c.bg_primary} !important;
-            background-color: {c.bg_primary} !important;
+            background: {bg_primary} !important;
+            background-color: {bg_primary} !important;
             border: none !important;
         }}
 
         /* The actual visible input container */
         [data-testid="stChatInput"] [data-baseweb="base-input"] {{
-            background-color: {c.bg_secondary} !important;
-            border: 1px solid {c.border} !important;
+            background-color: {bg_secondary} !important;
+            border: 1px solid {border} !important;
             border-radius: 24px !important;
             padding: 0.5rem 1rem !important;
         }}
 
         [data-testid="stChatInput"] [data-baseweb="base-input"]:hover {{
-            border-color: {c.text_muted} !important;
+            border-color: {text_muted} !important;
         }}
 
         [data-testid="stChatInput"] [data-baseweb="base-input"]:focus-within {{
-            border-color: {c.accent} !important;
+            border-color: {accent} !important;
             box-shadow: 0 0 0 2px rgba(237, 137, 54, 0.2) !important;
         }}
 
@@ -436,94 +436,94 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
         /* Textarea */
         [data-testid="stChatInput"] textarea {{
             background: transparent !important;
-            color: {c.text_primary} !important;
-            caret-color: {c.accent} !important;
+            color: {text_primary} !important;
+            caret-color: {accent} !important;
             border: none !important;
             outline: none !important;
         }}
 
         [data-testid="stChatInput"] textarea::placeholder {{
-            color: {c.text_muted} !important;
+            color: {text_muted} !important;
         }}
 
         /* Send button */
         [data-testid="stChatInput"] button {{
-            color: {c.accent} !important;
+            color: {accent} !important;
             background: transparent !important;
             border: none !important;
         }}
         [data-testid="stChatInput"] button:hover {{
-            color: {c.accent_hover} !important;
+            color: {accent_hover} !important;
         }}
 
         /* Main area buttons */
         .stButton > button {{
-            background-color: {c.bg_secondary} !important;
-            background: {c.bg_secondary} !important;
-            color: {c.text_primary} !important;
-            border: 1px solid {c.border} !important;
+            background-color: {bg_secondary} !important;
+            background: {bg_secondary} !important;
+            color: {text_primary} !important;
+            border: 1px solid {border} !important;
         }}
         .stButton > button:hover {{
-            background-color: {c.bg_button} !important;
-            background: {c.bg_button} !important;
-            border-color: {c.accent} !important;
-            color: {c.text_primary} !important;
+            background-color: {bg_button} !important;
+            background: {bg_button} !important;
+            border-color: {accent} !important;
+            color: {text_primary} !important;
         }}
 
         /* Expander */
         [data-testid="stExpander"],
         [data-testid="stExpander"] > div {{
-            background-color: {c.bg_secondary} !important;
-            background: {c.bg_secondary} !important;
-            border: 1px solid {c.border} !important;
+            background-color: {bg_secondary} !important;
+            background: {bg_secondary} !important;
+            border: 1px solid {border} !important;
         }}
         [data-testid="stExpander"] summary,
         [data-testid="stExpander"] summary span {{
-            color: {c.text_secondary} !important;
+            color: {text_secondary} !important;
             background-color: transparent !important;
         }}
         [data-testid="stExpanderDetails"] {{
-            background-color: {c.bg_secondary} !important;
-            background: {c.bg_secondary} !important;
+            background-color: {bg_secondary} !important;
+            background: {bg_secondary} !important;
         }}
 
         /* Verse cards */
         .verse-card {{
-            background: {c.verse_card_bg} !important;
-            border-left-color: {c.accent} !important;
+            background: {verse_card_bg} !important;
+            border-left-color: {accent} !important;
         }}
         .verse-ref {{
-            color: {c.accent} !important;
+            color: {accent} !important;
         }}
         .verse-text {{
-            color: {c.text_primary} !important;
+            color: {text_primary} !important;
         }}
 
         /* Theme tags */
         .theme-tag {{
             background-color: rgba(72, 187, 120, 0.2) !important;
-            color: {c.accent_green} !important;
+            color: {accent_green} !important;
         }}
 
         /* Toggle */
         [data-testid="stToggle"] span {{
-            color: {c.text_primary} !important;
+            color: {text_primary} !important;
         }}
 
         /* All markdown text */
         .stMarkdown, .stMarkdown p, .stMarkdown span {{
-            color: {c.text_primary} !important;
+            color: {text_primary} !important;
         }}
 
         /* Dividers */
         hr {{
-            border-color: {c.border} !important;
+            border-color: {border} !important;
         }}
 
         /* Toast */
         [data-testid="stToast"] {{
-            background-color: {c.bg_secondary} !important;
-            color: {c.text_primary} !important;
+            background-color: {bg_secondary} !important;
+            color: {text_primary} !important;
         }}
 
         /* Typing indicator dark mode - no background */
@@ -531,20 +531,20 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
             background: transparent !important;
         }}
         .typing-text {{
-            color: {c.text_muted} !important;
+            color: {text_muted} !important;
         }}
         .typing-dot {{
-            background-color: {c.accent} !important;
+            background-color: {accent} !important;
         }}
 
         /* Copy button dark mode */
         .copy-btn {{
-            border-color: {c.border} !important;
-            color: {c.text_secondary} !important;
+            border-color: {border} !important;
+            color: {text_secondary} !important;
         }}
         .copy-btn:hover {{
-            border-color: {c.accent} !important;
-            color: {c.accent} !important;
+            border-color: {accent} !important;
+            color: {accent} !important;
         }}
 
         /* Scrollbar */
@@ -553,14 +553,14 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
             height: 8px;
         }}
         ::-webkit-scrollbar-track {{
-            background: {c.bg_sidebar};
+            background: {bg_sidebar};
         }}
         ::-webkit-scrollbar-thumb {{
-            background: {c.border};
+            background: {border};
             border-radius: 4px;
         }}
         ::-webkit-scrollbar-thumb:hover {{
-            background: {c.text_muted};
+            background: {text_muted};
         }}
 
         /* Catch-all for remaining light backgrounds */
@@ -570,26 +570,29 @@ def _get_dark_mode_css(c: ColorScheme) -> str:
     """
 
 
+def _get_dark_mode_css(c: ColorScheme) -> str:
+    """Generate dark mode CSS from color scheme."""
+    return DARK_MODE_TEMPLATE.format_map(asdict(c))
+
+
 # =============================================================================
 # LIGHT MODE SPECIFIC STYLES
 # =============================================================================
 
-def _get_light_mode_css(c: ColorScheme) -> str:
-    """Generate light mode CSS from color scheme."""
-    return f"""
+LIGHT_MODE_TEMPLATE = """
         /* ===== LIGHT MODE ===== */
 
         .header-title {{
-            color: {c.text_primary};
+            color: {text_primary};
         }}
         .header-subtitle {{
-            color: {c.text_secondary};
+            color: {text_secondary};
         }}
 
         /* Chat messages - light mode modern styling */
         [data-testid="stChatMessage"] {{
-            background-color: {c.bg_secondary} !important;
-            border: 1px solid {c.border} !important;
+            background-color: {bg_secondary} !important;
+            border: 1px solid {border} !important;
             border-radius: 16px !important;
             padding: 1rem !important;
             margin-bottom: 0.75rem !important;
@@ -608,25 +611,25 @@ def _get_light_mode_css(c: ColorScheme) -> str:
         [data-testid="stChatInput"] [class*="st-emotion"],
         [data-testid="stChatInput"] [data-baseweb],
         [data-testid="stChatInput"] [data-baseweb] > div {{
-            background: {c.bg_primary} !important;
-            background-color: {c.bg_primary} !important;
+            background: {bg_primary} !important;
+            background-color: {bg_primary} !important;
             border: none !important;
         }}
 
         /* The visible input container */
         [data-testid="stChatInput"] [data-baseweb="base-input"] {{
-            background-color: {c.bg_secondary} !important;
-            border: 1px solid {c.border} !important;
+            background-color: {bg_secondary} !important;
+            border: 1px solid {border} !important;
             border-radius: 24px !important;
             padding: 0.5rem 1rem !important;
         }}
 
         [data-testid="stChatInput"] [data-baseweb="base-input"]:hover {{
-            border-color: {c.text_muted} !important;
+            border-color: {text_muted} !important;
         }}
 
         [data-testid="stChatInput"] [data-baseweb="base-input"]:focus-within {{
-            border-color: {c.accent} !important;
+            border-color: {accent} !important;
             box-shadow: 0 0 0 2px rgba(230, 126, 34, 0.15) !important;
         }}
 
@@ -639,42 +642,42 @@ def _get_light_mode_css(c: ColorScheme) -> str:
         /* Textarea */
         [data-testid="stChatInput"] textarea {{
             background: transparent !important;
-            color: {c.text_primary} !important;
+            color: {text_primary} !important;
             border: none !important;
             outline: none !important;
         }}
 
         /* Send button */
         [data-testid="stChatInput"] button {{
-            color: {c.accent} !important;
+            color: {accent} !important;
             background: transparent !important;
             border: none !important;
         }}
 
         /* Verse cards */
         .verse-card {{
-            background: linear-gradient(135deg, {c.verse_card_bg} 0%, #ebedee 100%);
-            border-left-color: {c.accent};
+            background: linear-gradient(135deg, {verse_card_bg} 0%, #ebedee 100%);
+            border-left-color: {accent};
             box-shadow: 0 2px 8px rgba(0,0,0,0.05);
         }}
         .verse-ref {{
-            color: {c.accent};
+            color: {accent};
         }}
         .verse-text {{
-            color: {c.text_primary};
+            color: {text_primary};
         }}
 
         /* Theme tags */
         .theme-tag {{
             background-color: #e8f4e8;
-            color: {c.accent_green};
+            color: {accent_green};
         }}
 
         /* Sidebar buttons - modern styling */
         section[data-testid="stSidebar"] button,
         section[data-testid="stSidebar"] .stButton > button {{
-            background-color: {c.bg_button} !important;
-            border: 1px solid {c.border} !important;
+            background-color: {bg_button} !important;
+            border: 1px solid {border} !important;
             border-radius: 8px !important;
             padding: 0.5rem 0.75rem !important;
             min-height: 38px !important;
@@ -685,8 +688,8 @@ def _get_light_mode_css(c: ColorScheme) -> str:
         }}
         section[data-testid="stSidebar"] button:hover,
         section[data-testid="stSidebar"] .stButton > button:hover {{
-            background-color: {c.bg_button_hover} !important;
-            border-color: {c.accent} !important;
+            background-color: {bg_button_hover} !important;
+            border-color: {accent} !important;
         }}
 
         /* Main area buttons */
@@ -695,30 +698,54 @@ def _get_light_mode_css(c: ColorScheme) -> str:
             text-align: left;
             padding: 0.5rem 1rem;
             border-radius: 12px;
-            border: 1px solid {c.border};
-            background-color: {c.bg_button};
+            border: 1px solid {border};
+            background-color: {bg_button};
             transition: all 0.2s ease;
             font-weight: 500;
         }}
         .stButton > button:hover {{
-            background-color: {c.bg_button_hover};
-            border-color: {c.accent};
+            background-color: {bg_button_hover};
+            border-color: {accent};
             transform: translateY(-1px);
             box-shadow: 0 4px 12px rgba(0, 0, 0, 0.08);
         }}
     """
 
 
+def _get_light_mode_css(c: ColorScheme) -> str:
+    """Generate light mode CSS from color scheme."""
+    return LIGHT_MODE_TEMPLATE.format_map(asdict(c))
+
+
 # =============================================================================
 # MAIN CSS GENERATOR
 # =============================================================================
 
+def _build_css(dark_mode: bool) -> str:
+    """Assemble the complete <style> block for one mode."""
+    colors = DARK_COLORS if dark_mode else LIGHT_COLORS
+    mode_css = _get_dark_mode_css(colors) if dark_mode else _get_light_mode_css(colors)
+
+    return f"""
+    <style>
+        {COMMON_STYLES}
+        {mode_css}
+    </style>
+    """
+
+
+# Color schemes are constant, so each mode's CSS is built once at import
+# rather than on every Streamlit rerun
+DARK_MODE_CSS = _build_css(dark_mode=True)
+LIGHT_MODE_CSS = _build_css(dark_mode=False)
+
+
 def get_css(dark_mode: bool = False) -> str:
     """
-    Generate complete CSS for the application.
+    Get complete CSS for the application.
 
     Args:
-        dark_mode: Whether to generate dark mode styles
+        dark_mode: Whether to return dark mode styles
 
     Returns:
         Complete CSS wrapped in <style> tags
@@ -726,15 +753,7 @@ def get_css(dark_mode: bool = False) -> str:
     Usage:
         st.markdown(get_css(dark_mode=True), unsafe_allow_html=True)
     """
-    colors = DARK_COLORS if dark_mode else LIGHT_COLORS
-    mode_css = _get_dark_mode_css(colors) if dark_mode else _get_light_mode_css(colors)
-
-    return f"""
-    <style>
-        {COMMON_STYLES}
-        {mode_css}
-    </style>
-    """
+    return DARK_MODE_CSS if dark_mode else LIGHT_MODE_CSS
 
 
 # =============================================================================
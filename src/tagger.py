@@ -3,12 +3,17 @@ LLM-based Verse Tagger for GitaBae.
 Generates 2-3 thematic tags for each verse using OpenRouter/GPT.
 """
 
+import asyncio
+import hashlib
 import json
-import time
+import re
 from pathlib import Path
 from typing import Optional
 
-from .config import get_openai_client, Config
+from openai import APIError
+
+from .config import get_openai_client, get_async_openai_client, Config
+from .constants import TAG_CACHE_FILE
 
 
 # Predefined theme categories for consistency
@@ -52,20 +57,94 @@ Return ONLY a JSON array of 2-3 theme tags, nothing else. Example: ["duty", "act
 
 Tags:"""
 
+# Category list is fixed, so fill it into the prompt once at import
+_CATEGORIES_STR = ", ".join(THEME_CATEGORIES[:30])  # Use top categories
+_PROMPT_TEMPLATE = TAGGING_PROMPT.replace("{categories}", _CATEGORIES_STR)
+
+_ARRAY_RE = re.compile(r'\[[^\]]*\]')
+_TAG_RE = re.compile(r'"([^"]+)"')
+
+_THEME_SET = frozenset(THEME_CATEGORIES)
+
+# Plain inflections snapped back to their category, e.g. "devotional";
+# negated forms such as "non-attachment" or "inaction" are never snapped
+_INFLECTION_SUFFIXES = ("s", "es", "al", "ate", "ful", "ous", "ness", "ing", "ed")
+_NEGATION_PREFIXES = ("non", "un", "in")
+
+# Verses with less text than this are not worth an API call
+MIN_TAG_CHARS = 40
+
+
+class _TagCache:
+    """Persistent tag cache keyed by a hash of model and verse text."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else TAG_CACHE_FILE
+        self._tags: dict[str, list[str]] = {}
+        self._dirty = False
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._tags = json.load(f)
+
+    @staticmethod
+    def key(model: str, translation: str, commentary: str) -> str:
+        """Cache key for one tagging request."""
+        raw = f"{model}\x00{translation}\x00{commentary}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[list[str]]:
+        """Return a copy of the cached tags, or None on a miss."""
+        tags = self._tags.get(key)
+        return list(tags) if tags is not None else None
+
+    def set(self, key: str, tags: list[str]) -> None:
+        """Store tags; empty results are not cached so they get retried."""
+        if tags:
+            self._tags[key] = list(tags)
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Write the cache to disk if it changed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self._tags, f, ensure_ascii=False)
+        self._dirty = False
+
 
 class VerseTagger:
     """Tags verses with themes using LLM."""
 
-    def __init__(self, model: str = None):
+    def __init__(self, model: str = None, cache: Optional[_TagCache] = None):
         """
         Initialize tagger.
 
         Args:
             model: LLM model to use (default from config)
+            cache: Tag cache to use (default: data/.tag_cache.json)
         """
         Config.load()
-        self.client = get_openai_client()
+        self.client = get_openai_client(max_retries=Config.TAG_MAX_RETRIES)
         self.model = model or Config.LLM_MODEL
+        self.cache = cache if cache is not None else _TagCache()
+
+    def _build_prompt(self, translation: str, commentary: str) -> str:
+        """Build the tagging prompt for a verse."""
+        return _PROMPT_TEMPLATE.format(
+            translation=translation[:500],  # Limit length
+            commentary=commentary[:800]
+        )
+
+    def _request_kwargs(self, prompt: str) -> dict:
+        """Chat completion arguments shared by sync and async calls."""
+        return dict(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=50,
+            temperature=0.3  # Lower temperature for consistency
+        )
 
     def tag_verse(self, translation: str, commentary: str) -> list[str]:
         """
@@ -78,93 +157,218 @@ class VerseTagger:
         Returns:
             List of 2-3 theme tags
         """
-        prompt = TAGGING_PROMPT.format(
-            categories=", ".join(THEME_CATEGORIES[:30]),  # Use top categories
-            translation=translation[:500],  # Limit length
-            commentary=commentary[:800]
-        )
+        inputs = _tag_inputs(translation, commentary)
+        if inputs is None:
+            return []
+        translation, commentary = inputs
+
+        key = _TagCache.key(self.model, translation, commentary)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        prompt = self._build_prompt(translation, commentary)
 
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
-                temperature=0.3  # Lower temperature for consistency
+                **self._request_kwargs(prompt)
             )
+            content = _reply_content(response)
+            if content is None:
+                print("  Warning: Tagging failed - reply had no choices")
+                return []
+            tags = _parse_tags(content)
+            self.cache.set(key, tags)
+            return tags
+
+        except APIError as e:
+            # Retryable errors were already retried by the client
+            print(f"  Warning: Tagging failed - {e}")
+
+        return []
 
-            result = response.choices[0].message.content.strip()
+    async def _tag_one(self, aclient, sem: asyncio.Semaphore, verse: dict) -> list[str]:
+        """Tag one verse, waiting on the semaphore before calling the API."""
+        inputs = _tag_inputs(verse.get("translation", ""), verse.get("commentary", ""))
+        if inputs is None:
+            return []
+        translation, commentary = inputs
 
-            # Parse JSON array
-            tags = json.loads(result)
+        key = _TagCache.key(self.model, translation, commentary)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
 
-            # Validate and clean tags
-            if isinstance(tags, list):
-                tags = [t.lower().strip() for t in tags if isinstance(t, str)]
-                return tags[:3]  # Max 3 tags
+        prompt = self._build_prompt(translation, commentary)
 
-        except json.JSONDecodeError:
-            # Try to extract tags from non-JSON response
-            result = response.choices[0].message.content.strip()
-            # Look for quoted words
-            import re
-            tags = re.findall(r'"([^"]+)"', result)
-            if tags:
-                return [t.lower().strip() for t in tags[:3]]
-
-        except Exception as e:
-            print(f"  Warning: Tagging failed - {e}")
+        async with sem:
+            response = await aclient.chat.completions.create(
+                **self._request_kwargs(prompt)
+            )
 
-        return []
+        content = _reply_content(response)
+        if content is None:
+            print(f"  Warning: Tagging failed for verse {verse.get('verse', '?')} - reply had no choices")
+            return []
+        tags = _parse_tags(content)
+        self.cache.set(key, tags)
+        return tags
+
+    async def tag_verses_batch_async(
+        self,
+        verses: list[dict],
+        max_concurrency: int = 8,
+        progress_callback: Optional[callable] = None,
+        result_callback: Optional[callable] = None
+    ) -> list[dict]:
+        """
+        Tag multiple verses concurrently.
+
+        Each verse dict gets its "tags" key set in place as soon as its
+        request completes; no copies are made.
+
+        Args:
+            verses: List of verse dictionaries
+            max_concurrency: Maximum number of requests in flight
+            progress_callback: Optional callback(current, total)
+            result_callback: Optional callback(index, tags), called as each
+                verse finishes
+
+        Returns:
+            The same list of verses, now with tags
+        """
+        total = len(verses)
+        sem = asyncio.Semaphore(max_concurrency)
+        done = 0
+
+        async def run(aclient, index: int, verse: dict) -> list[str]:
+            nonlocal done
+            try:
+                tags = await self._tag_one(aclient, sem, verse)
+            except APIError as e:
+                print(f"  Warning: Tagging failed for verse {verse.get('verse', '?')} - {e}")
+                tags = []
+
+            verse["tags"] = tags
+            if result_callback:
+                result_callback(index, tags)
+            done += 1
+            if progress_callback:
+                progress_callback(done, total)
+            else:
+                print(f"  [{done}/{total}] Verse {verse.get('verse', '?')}: {tags}")
+            return tags
+
+        # One client per event loop; its connection pool is closed on exit
+        async with get_async_openai_client(max_retries=Config.TAG_MAX_RETRIES) as aclient:
+            await asyncio.gather(*(run(aclient, i, v) for i, v in enumerate(verses)))
+
+        return verses
 
     def tag_verses_batch(
         self,
         verses: list[dict],
-        delay: float = 0.5,
-        progress_callback: Optional[callable] = None
+        max_concurrency: int = 8,
+        progress_callback: Optional[callable] = None,
+        result_callback: Optional[callable] = None
     ) -> list[dict]:
         """
-        Tag multiple verses with rate limiting.
+        Tag multiple verses concurrently (blocking wrapper).
 
         Args:
             verses: List of verse dictionaries
-            delay: Delay between API calls (seconds)
+            max_concurrency: Maximum number of requests in flight
             progress_callback: Optional callback(current, total)
+            result_callback: Optional callback(index, tags)
 
         Returns:
             List of verses with tags added
         """
-        total = len(verses)
-        tagged_verses = []
+        return asyncio.run(self.tag_verses_batch_async(
+            verses,
+            max_concurrency=max_concurrency,
+            progress_callback=progress_callback,
+            result_callback=result_callback
+        ))
 
-        for i, verse in enumerate(verses):
-            # Get tags
-            tags = self.tag_verse(
-                verse.get("translation", ""),
-                verse.get("commentary", "")
-            )
 
-            # Update verse with tags
-            verse_copy = verse.copy()
-            verse_copy["tags"] = tags
-            tagged_verses.append(verse_copy)
+def _tag_inputs(translation: str, commentary: str) -> Optional[tuple[str, str]]:
+    """
+    Prepare the text sent for tagging.
+
+    Returns:
+        (translation, commentary) with a commentary that merely repeats
+        the translation dropped, or None if there is too little text
+    """
+    translation = translation.strip()
+    commentary = commentary.strip()
+    if commentary == translation:
+        commentary = ""
+    if len(translation) + len(commentary) < MIN_TAG_CHARS:
+        return None
+    return translation, commentary
+
+
+def _reply_content(response) -> Optional[str]:
+    """Text of the first choice, or None if the reply has no choices."""
+    # OpenRouter can return a 200 with null or empty choices
+    if not response.choices:
+        return None
+    return (response.choices[0].message.content or "").strip()
+
+
+def _parse_tags(result: str) -> list[str]:
+    """Parse the LLM reply into at most 3 lowercase tags."""
+    try:
+        tags = json.loads(result)
+    except json.JSONDecodeError:
+        # Non-JSON reply: use an embedded JSON array if there is one,
+        # e.g. 'Sure! ["duty", "action"]', else look for quoted words
+        match = _ARRAY_RE.search(result)
+        try:
+            tags = json.loads(match.group(0)) if match else None
+        except json.JSONDecodeError:
+            tags = None
+        if tags is None:
+            tags = _TAG_RE.findall(result)
+
+    # JSON object reply, e.g. {"tags": ["duty"]}: use its first list value
+    if isinstance(tags, dict):
+        tags = next((v for v in tags.values() if isinstance(v, list)), None)
+
+    # Validate and clean tags
+    if isinstance(tags, list):
+        return _clean_tags(tags)
+
+    return []
 
-            # Progress update
-            if progress_callback:
-                progress_callback(i + 1, total)
-            else:
-                print(f"  [{i+1}/{total}] Verse {verse.get('verse', '?')}: {tags}")
 
-            # Rate limiting
-            if i < total - 1:
-                time.sleep(delay)
+def _clean_tags(tags: list) -> list[str]:
+    """Normalize tags, snap inflected categories to THEME_CATEGORIES and dedupe."""
+    cleaned = []
+    for tag in tags:
+        if not isinstance(tag, str):
+            continue
+        tag = _snap_tag(tag.lower().strip())
+        if tag and tag not in cleaned:
+            cleaned.append(tag)
+    return cleaned[:3]  # Max 3 tags
 
-        return tagged_verses
+
+def _snap_tag(tag: str) -> str:
+    """Map e.g. "compassionate" to "compassion"; other tags are kept as-is."""
+    if tag in _THEME_SET or tag.startswith(_NEGATION_PREFIXES):
+        return tag
+    for suffix in _INFLECTION_SUFFIXES:
+        if tag.endswith(suffix) and tag[:-len(suffix)] in _THEME_SET:
+            return tag[:-len(suffix)]
+    return tag
 
 
 def tag_chapter_file(
     input_path: str,
     output_path: str = None,
-    delay: float = 0.5
+    max_concurrency: int = 8
 ) -> str:
     """
     Tag all verses in a chapter JSON file.
@@ -172,7 +376,7 @@ def tag_chapter_file(
     Args:
         input_path: Path to input JSON file
         output_path: Path to output JSON file (default: adds _tagged suffix)
-        delay: Delay between API calls
+        max_concurrency: Maximum number of tagging requests in flight
 
     Returns:
         Path to output file
@@ -191,17 +395,51 @@ def tag_chapter_file(
     verses = data.get("verses", [])
     print(f"Found {len(verses)} verses to tag")
 
-    print(f"\nTagging verses (delay={delay}s between calls)...")
     tagger = VerseTagger()
-    tagged_verses = tagger.tag_verses_batch(verses, delay=delay)
+
+    # Progress sidecar: one JSON line per finished verse, so an interrupted
+    # run picks up where it stopped instead of re-tagging everything
+    progress_path = output_path.with_suffix(".jsonl")
+    done = _load_progress(progress_path, verses, tagger.model)
+    for i, tags in done.items():
+        verses[i]["tags"] = tags
+    pending = [i for i in range(len(verses)) if i not in done]
+    if done:
+        print(f"Resuming: {len(done)} verses already tagged in {progress_path}")
+
+    print(f"\nTagging {len(pending)} verses (max_concurrency={max_concurrency})...")
+    try:
+        with open(progress_path, 'a', encoding='utf-8') as progress:
+            def record(index: int, tags: list[str]) -> None:
+                if not tags:
+                    return  # Failed; retry on the next run
+                i = pending[index]
+                line = {
+                    "i": i,
+                    "verse": verses[i].get("verse"),
+                    "key": _progress_key(tagger.model, verses[i]),
+                    "tags": tags
+                }
+                progress.write(json.dumps(line, ensure_ascii=False) + "\n")
+                progress.flush()
+
+            tagger.tag_verses_batch(
+                [verses[i] for i in pending],
+                max_concurrency=max_concurrency,
+                result_callback=record
+            )
+    finally:
+        tagger.cache.flush()
 
     # Update data
+    tagged_verses = verses
     data["verses"] = tagged_verses
     data["metadata"]["tagged"] = True
 
     # Save
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
+    progress_path.unlink()
 
     print(f"\nSaved tagged verses to {output_path}")
 
@@ -218,6 +456,30 @@ def tag_chapter_file(
     return str(output_path)
 
 
+def _progress_key(model: str, verse: dict) -> str:
+    """Identify a verse's content, so edited verses are re-tagged on resume."""
+    return _TagCache.key(model, verse.get("translation", ""), verse.get("commentary", ""))
+
+
+def _load_progress(path: Path, verses: list[dict], model: str) -> dict[int, list[str]]:
+    """Read tags recorded by an interrupted tag_chapter_file run."""
+    done = {}
+    if not path.exists():
+        return done
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial line from a crash mid-write
+            i = entry.get("i")
+            # Ignore entries that no longer match the input file's content
+            if isinstance(i, int) and 0 <= i < len(verses) and _progress_key(model, verses[i]) == entry.get("key"):
+                done[i] = entry["tags"]
+    return done
+
+
 def main():
     """Main function to run tagging pipeline."""
     import sys
@@ -234,7 +496,7 @@ def main():
     print("GitaBae - Verse Tagging Pipeline")
     print("=" * 60)
 
-    tag_chapter_file(input_file, output_file, delay=0.5)
+    tag_chapter_file(input_file, output_file)
 
 
 if __name__ == "__main__":
@@ -6,8 +6,13 @@ Provides abstraction over vector database operations.
 """
 
 import json
+import threading
+from collections.abc import Sized
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
 from .config import get_pinecone_index, get_openai_client, Config
 from .constants import get_chapter_embeddings_path
@@ -24,50 +29,74 @@ class VectorStore:
         Config.load()
         self.index = get_pinecone_index()
         self.client = get_openai_client()
+        # Per-instance so cached vectors never outlive the client that made them
+        self._embed_cached = lru_cache(maxsize=1024)(self._embed)
         logger.info("VectorStore initialized")
 
     def upsert_vectors(
         self,
-        vectors: List[dict],
+        vectors: Iterable[dict],
         batch_size: int = 50,
-        namespace: str = ""
+        namespace: str = "",
+        max_parallel: int = 8
     ) -> int:
         """
         Upsert vectors to Pinecone.
 
         Args:
-            vectors: List of vector dicts with 'id', 'values', 'metadata'
+            vectors: Vector dicts with 'id', 'values', 'metadata'; any
+                iterable, consumed one batch at a time
             batch_size: Number of vectors per batch
             namespace: Optional namespace
+            max_parallel: Maximum number of batch upserts in flight
 
         Returns:
             Number of vectors upserted
         """
-        total = len(vectors)
+        total = len(vectors) if isinstance(vectors, Sized) else "?"
         upserted = 0
 
-        logger.info(f"Upserting {total} vectors to Pinecone")
-
-        for i in range(0, total, batch_size):
-            batch = vectors[i:i + batch_size]
-
-            # Convert to Pinecone format
-            pinecone_vectors = [
-                {
-                    "id": v["id"],
-                    "values": v["values"],
-                    "metadata": v["metadata"]
-                }
-                for v in batch
-            ]
-
-            self.index.upsert(vectors=pinecone_vectors, namespace=namespace)
-            upserted += len(batch)
-            logger.info(f"Upserted {upserted}/{total} vectors")
-
-        logger.info(f"Completed upserting {upserted} vectors")
+        logger.info("Upserting %s vectors to Pinecone", total)
+
+        it = iter(vectors)
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+            pending = set()
+
+            for batch in iter(lambda: list(islice(it, batch_size)), []):
+                # Convert to Pinecone format (embeddings files already match it)
+                if all(_is_pinecone_vector(v) for v in batch):
+                    pinecone_vectors = batch
+                else:
+                    pinecone_vectors = [
+                        {
+                            "id": v["id"],
+                            "values": v["values"],
+                            "metadata": v["metadata"]
+                        }
+                        for v in batch
+                    ]
+
+                # Bound in-flight batches so memory stays O(max_parallel * batch_size)
+                if len(pending) >= max_parallel:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        upserted += future.result()
+                        logger.info("Upserted %d/%s vectors", upserted, total)
+
+                pending.add(executor.submit(self._upsert_batch, pinecone_vectors, namespace))
+
+            for future in as_completed(pending):
+                upserted += future.result()
+                logger.info("Upserted %d/%s vectors", upserted, total)
+
+        logger.info("Completed upserting %d vectors", upserted)
         return upserted
 
+    def _upsert_batch(self, vectors: List[dict], namespace: str) -> int:
+        """Upsert one batch and return its size."""
+        self.index.upsert(vectors=vectors, namespace=namespace)
+        return len(vectors)
+
     def query(
         self,
         query_text: str,
@@ -87,16 +116,71 @@ class VectorStore:
         Returns:
             List of matching results with scores
         """
-        logger.debug(f"Querying for: {query_text[:50]}...")
+        logger.debug("Querying for: %s...", query_text[:50])
+
+        # Generate query embedding (repeat queries are served from cache)
+        query_vector = list(self._embed_cached(Config.EMBEDDING_MODEL, query_text))
+
+        matches = self._search(query_vector, top_k, namespace, include_metadata)
+
+        logger.debug("Found %d matches", len(matches))
+        return matches
+
+    def query_many(
+        self,
+        texts: List[str],
+        top_k: int = 5,
+        namespace: str = "",
+        include_metadata: bool = True,
+        max_parallel: int = 8
+    ) -> List[List[dict]]:
+        """
+        Query vectors for several texts at once.
+
+        All texts are embedded in a single API call, then the Pinecone
+        queries run in parallel.
+
+        Args:
+            texts: Texts to search for
+            top_k: Number of results per text
+            namespace: Optional namespace
+            include_metadata: Whether to include metadata in results
+            max_parallel: Maximum number of Pinecone queries in flight
+
+        Returns:
+            One list of matching results per text, in input order
+        """
+        if not texts:
+            return []
+
+        logger.debug("Querying for %d texts", len(texts))
 
-        # Generate query embedding
         response = self.client.embeddings.create(
             model=Config.EMBEDDING_MODEL,
-            input=query_text
+            input=texts
         )
-        query_vector = response.data[0].embedding
+        # Embeddings may come back out of order; 'index' maps them to inputs
+        vectors = [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
 
-        # Query Pinecone
+        with ThreadPoolExecutor(max_workers=min(max_parallel, len(vectors))) as executor:
+            return list(executor.map(
+                lambda v: self._search(v, top_k, namespace, include_metadata),
+                vectors
+            ))
+
+    def _embed(self, model: str, text: str) -> Tuple[float, ...]:
+        """Embed one text; returns a tuple so results can be cached."""
+        response = self.client.embeddings.create(model=model, input=text)
+        return tuple(response.data[0].embedding)
+
+    def _search(
+        self,
+        query_vector: List[float],
+        top_k: int,
+        namespace: str,
+        include_metadata: bool
+    ) -> List[dict]:
+        """Query Pinecone with an embedding and format the matches."""
         results = self.index.query(
             vector=query_vector,
             top_k=top_k,
@@ -115,7 +199,6 @@ class VectorStore:
                 result["metadata"] = match.metadata
             matches.append(result)
 
-        logger.debug(f"Found {len(matches)} matches")
         return matches
 
     def get_stats(self) -> dict:
@@ -130,15 +213,41 @@ class VectorStore:
     def delete_all(self, namespace: str = "") -> bool:
         """Delete all vectors in namespace."""
         try:
-            logger.warning(f"Deleting all vectors in namespace: '{namespace}'")
+            logger.warning("Deleting all vectors in namespace: '%s'", namespace)
             self.index.delete(delete_all=True, namespace=namespace)
             logger.info("Delete operation completed")
             return True
         except Exception as e:
-            logger.error(f"Error deleting vectors: {e}", exc_info=True)
+            logger.error("Error deleting vectors: %s", e, exc_info=True)
             return False
 
 
+_INSTANCE: Optional[VectorStore] = None
+_INSTANCE_LOCK = threading.Lock()
+
+
+def get_vectorstore() -> VectorStore:
+    """
+    Get the shared VectorStore, creating it on first use.
+
+    Reusing one instance keeps the Pinecone index handle, the OpenAI
+    client's connection pool and the query embedding cache alive.
+    """
+    global _INSTANCE
+    if _INSTANCE is None:
+        # Streamlit serves sessions from several threads
+        with _INSTANCE_LOCK:
+            if _INSTANCE is None:
+                _INSTANCE = VectorStore()
+    return _INSTANCE
+
+
+def _is_pinecone_vector(v: dict) -> bool:
+    """True if v has exactly the 'id', 'values' and 'metadata' keys."""
+    # Cheaper than v.keys() == {...}, which builds a set comparison per vector
+    return len(v) == 3 and "id" in v and "values" in v and "metadata" in v
+
+
 def upload_embeddings_to_pinecone(
     embeddings_path: Optional[str] = None,
     chapter: int = 1,
@@ -160,21 +269,21 @@ def upload_embeddings_to_pinecone(
     else:
         embeddings_path = Path(embeddings_path)
 
-    logger.info(f"Loading embeddings from {embeddings_path}")
+    logger.info("Loading embeddings from %s", embeddings_path)
 
     with open(embeddings_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
     vectors = data.get("vectors", [])
-    logger.info(f"Found {len(vectors)} vectors to upload")
+    logger.info("Found %d vectors to upload", len(vectors))
 
     logger.info("Uploading to Pinecone...")
-    store = VectorStore()
+    store = get_vectorstore()
     count = store.upsert_vectors(vectors, namespace=namespace)
 
     logger.info("Upload complete!")
     stats = store.get_stats()
-    logger.info(f"Index stats: {stats}")
+    logger.info("Index stats: %s", stats)
 
     return count
 
@@ -187,15 +296,13 @@ def test_retrieval(queries: List[str], top_k: int = 3) -> None:
         queries: List of test queries
         top_k: Number of results per query
     """
-    store = VectorStore()
+    store = get_vectorstore()
 
-    for query in queries:
+    for query, results in zip(queries, store.query_many(queries, top_k=top_k)):
         print(f"\n{'='*60}")
         print(f"Query: {query}")
         print("=" * 60)
 
-        results = store.query(query, top_k=top_k)
-
         for i, result in enumerate(results, 1):
             print(f"\n--- Result {i} (score: {result['score']:.4f}) ---")
             meta = result.get("metadata", {})
@@ -0,0 +1,129 @@
+"""
+Shared pytest fixtures for GitaBae tests.
+
+Expensive, read-only objects are session-scoped so each is built once
+per test run instead of once per test.
+"""
+
+import pytest
+
+from src.generator import ResponseGenerator
+from src.retriever import Retriever
+from src.safety import SafetyChecker
+from src.vectorstore import VectorStore, get_vectorstore
+
+# Every query the retrieval tests send, prefetched by cached_store in one
+# embedding call; keep in sync when adding retrieval tests
+TEST_QUERIES = [
+    # test_phase2 (TestRetrievalQuality)
+    "How do I deal with anxiety and fear?",
+    "What is my duty in life?",
+    "How to overcome attachment?",
+    # test_phase3
+    "How to deal with fear?",
+    "What is duty?",
+    "Finding peace",
+    "What is dharma?",
+    "How to find peace?",
+    "How to deal with anxiety?",
+    "What is my purpose?",
+    "How to overcome fear?",
+    "Finding inner peace",
+    "How to act without attachment?",
+    "I'm feeling anxious and afraid",
+    "What should I do in life?",
+    "I'm too attached to results",
+    "test query",
+    # test_phase4
+    "How do I deal with fear?",
+]
+
+# Results are fetched at this depth once and sliced to each test's top_k
+CACHE_TOP_K = 10
+
+
+def pytest_addoption(parser):
+    """Add the --live option."""
+    parser.addoption(
+        "--live",
+        action="store_true",
+        default=False,
+        help="run integration tests that call OpenRouter and Pinecone"
+    )
+
+
+def pytest_configure(config):
+    """Register custom markers."""
+    config.addinivalue_line(
+        "markers",
+        "integration: needs API credentials and live services; skipped unless --live"
+    )
+    # Also registered by pytest-xdist; declared here so runs without it stay warning-free
+    config.addinivalue_line(
+        "markers",
+        "xdist_group(name): run all tests of the group on one xdist worker"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip integration tests unless --live is given."""
+    if config.getoption("--live"):
+        return
+    skip = pytest.mark.skip(reason="needs --live")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def vector_store():
+    """Shared vector store fixture."""
+    return get_vectorstore()
+
+
+@pytest.fixture(scope="session")
+def cached_store():
+    """
+    Separate vector store whose query() is served from prefetched results.
+
+    TEST_QUERIES are fetched in one batch; other queries are fetched once
+    at CACHE_TOP_K on first use and cached too, and calls with non-default
+    options go straight to Pinecone. The shared vector_store is left alone,
+    so tests of VectorStore.query itself still exercise the real path.
+    """
+    store = VectorStore()
+    results = store.query_many(TEST_QUERIES, top_k=CACHE_TOP_K)
+    cache = dict(zip(TEST_QUERIES, results))
+    live_query = store.query
+
+    def query(query_text, top_k=5, namespace="", include_metadata=True):
+        if top_k > CACHE_TOP_K or namespace or not include_metadata:
+            return live_query(query_text, top_k=top_k, namespace=namespace, include_metadata=include_metadata)
+        if query_text not in cache:
+            cache[query_text] = live_query(query_text, top_k=CACHE_TOP_K)
+        return cache[query_text][:top_k]
+
+    store.query = query
+    return store
+
+
+@pytest.fixture(scope="session")
+def retriever(cached_store):
+    """Shared retriever fixture, querying cached_store (tests must not mutate it)."""
+    retriever = Retriever()
+    retriever.vector_store = cached_store
+    return retriever
+
+
+@pytest.fixture(scope="session")
+def checker():
+    """Shared safety checker fixture."""
+    return SafetyChecker()
+
+
+@pytest.fixture(scope="session")
+def generator(cached_store):
+    """Shared response generator fixture (generate() keeps no per-call state)."""
+    generator = ResponseGenerator()
+    generator.retriever.vector_store = cached_store
+    return generator
@@ -5,20 +5,34 @@ Tests for configuration, tagging, embeddings, and vector store.
 
 import os
 import json
+import threading
+import time
 import pytest
 from pathlib import Path
+from types import SimpleNamespace
 
 # Add src to path
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.config import Config, get_openai_client, get_pinecone_index
+from src.embeddings import EmbeddingsGenerator
+from src import tagger as tagger_module
+from src.tagger import VerseTagger, _TagCache, _clean_tags, _parse_tags, tag_chapter_file
+from src.vectorstore import VectorStore
 
+# Tags that count as a relevant hit in the retrieval quality tests
+FEAR_TAGS = frozenset({"fear", "anxiety", "courage"})
+DUTY_TAGS = frozenset({"duty", "dharma"})
+ATTACHMENT_TAGS = frozenset({"attachment", "detachment", "renunciation", "surrender"})
+
+
+@pytest.mark.integration
 class TestConfig:
     """Tests for configuration module."""
 
     def test_config_loads(self):
         """Test that configuration loads successfully."""
-        from src.config import Config
         Config.load()
 
         assert Config.OPENROUTER_API_KEY is not None
@@ -27,22 +41,17 @@ class TestConfig:
 
     def test_config_validates(self):
         """Test that configuration validates correctly."""
-        from src.config import Config
         Config.load()
 
         assert Config.validate() is True
 
     def test_openai_client_creation(self):
         """Test that OpenAI client can be created."""
-        from src.config import get_openai_client
-
         client = get_openai_client()
         assert client is not None
 
     def test_pinecone_client_creation(self):
         """Test that Pinecone client can be created."""
-        from src.config import get_pinecone_index
-
         index = get_pinecone_index()
         assert index is not None
 
@@ -50,9 +59,9 @@ class TestConfig:
 class TestTaggedData:
     """Tests for tagged verse data."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def tagged_data(self):
-        """Load tagged data fixture."""
+        """Load tagged data fixture (parsed once, read-only)."""
         data_path = Path(__file__).parent.parent / "data" / "chapter_1_tagged.json"
         with open(data_path, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -95,20 +104,205 @@ class TestTaggedData:
         assert verses[0]["verse"] == "1"
 
 
+class TestTagCache:
+    """Tests for the persistent tag cache (offline)."""
+
+    def test_get_returns_copy(self, tmp_path):
+        """Test that callers cannot mutate cached tags through a hit."""
+        cache = _TagCache(tmp_path / "tags.json")
+        tags = ["duty", "action"]
+        cache.set("k", tags)
+        tags.append("karma")
+
+        first = cache.get("k")
+        first.append("fear")
+
+        assert cache.get("k") == ["duty", "action"]
+        assert cache.get("k") is not cache.get("k")
+
+    def test_empty_tags_not_cached(self, tmp_path):
+        """Test that failed (empty) results are left to be retried."""
+        cache = _TagCache(tmp_path / "tags.json")
+        cache.set("k", [])
+
+        assert cache.get("k") is None
+
+    def test_flush_round_trip(self, tmp_path):
+        """Test that flushed tags are loaded by a new cache."""
+        path = tmp_path / "tags.json"
+        cache = _TagCache(path)
+        cache.set("k", ["peace"])
+        cache.flush()
+
+        assert _TagCache(path).get("k") == ["peace"]
+
+
+class TestTagParsing:
+    """Tests for parsing and cleaning LLM tag replies (offline)."""
+
+    @pytest.mark.parametrize("raw, expected", [
+        (["devotional"], ["devotion"]),
+        (["compassionate"], ["compassion"]),
+        (["fears"], ["fear"]),
+        (["peaceful"], ["peace"]),
+        # Negations must not flip to the opposite theme
+        (["non-attachment"], ["non-attachment"]),
+        (["nonattachment"], ["nonattachment"]),
+        (["inaction"], ["inaction"]),
+        (["unattached"], ["unattached"]),
+        # Unknown tags are kept as-is
+        (["detached"], ["detached"]),
+        ([" Duty ", "DHARMA"], ["duty", "dharma"]),
+        (["duty", "duties", "Duty"], ["duty", "duties"]),
+        (["fear", "anxiety", "courage", "peace"], ["fear", "anxiety", "courage"]),
+        (["duty", 3, None, ""], ["duty"]),
+    ])
+    def test_clean_tags(self, raw, expected):
+        """Test tag normalization, snapping, dedupe and the 3-tag cap."""
+        assert _clean_tags(raw) == expected
+
+    @pytest.mark.parametrize("reply, expected", [
+        ('["duty", "action"]', ["duty", "action"]),
+        ('Sure! ["karma", "yoga"] are the themes.', ["karma", "yoga"]),
+        ('Themes: "fear", "grief"', ["fear", "grief"]),
+        ('{"tags": ["duty"]}', ["duty"]),
+        ('{"count": 1}', []),
+        ("", []),
+    ])
+    def test_parse_tags(self, reply, expected):
+        """Test JSON, embedded-array and quoted-word replies."""
+        assert _parse_tags(reply) == expected
+
+
+class FakeAsyncOpenAI:
+    """Stand-in for AsyncOpenAI that records prompts and can fail mid-run."""
+
+    def __init__(self, fail_after=None, no_choices_for=()):
+        self.prompts = []
+        self.fail_after = fail_after
+        self.no_choices_for = no_choices_for
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, messages, **kwargs):
+        if self.fail_after is not None and len(self.prompts) >= self.fail_after:
+            raise RuntimeError("simulated crash")
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        if any(text in prompt for text in self.no_choices_for):
+            return SimpleNamespace(choices=None)
+        message = SimpleNamespace(content='["duty", "action"]')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestTagChapterResume:
+    """Tests for resuming an interrupted tag_chapter_file run (offline)."""
+
+    @pytest.fixture
+    def chapter_file(self, tmp_path, monkeypatch):
+        """Write a 10-verse chapter and isolate the tagger from real services."""
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        monkeypatch.setenv("PINECONE_API_KEY", "test-key")
+        verses = [
+            {
+                "chapter": 1,
+                "verse": str(n),
+                "translation": f"Translation of verse {n} about duty and action.",
+                "commentary": f"Commentary on verse {n}.",
+            }
+            for n in range(1, 11)
+        ]
+        path = tmp_path / "chapter_1.json"
+        path.write_text(json.dumps({"metadata": {}, "verses": verses}), encoding="utf-8")
+        return path
+
+    def run(self, monkeypatch, path, client):
+        """Run tag_chapter_file one request at a time against a fake client."""
+        monkeypatch.setattr(tagger_module, "get_async_openai_client", lambda **kwargs: client)
+        # A fresh tag cache per run, so only the progress sidecar can skip verses
+        monkeypatch.setattr(tagger_module, "TAG_CACHE_FILE", path.parent / f"cache_{id(client)}.json")
+        return tag_chapter_file(path, max_concurrency=1)
+
+    @staticmethod
+    def requested(client):
+        """Verse numbers whose translation appeared in a prompt."""
+        return [
+            n for prompt in client.prompts for n in range(1, 11)
+            if f"verse {n} about" in prompt
+        ]
+
+    def test_resume_tags_only_remaining_verses(self, chapter_file, monkeypatch):
+        """Test that a rerun after a crash only requests untagged verses."""
+        crashed = FakeAsyncOpenAI(fail_after=3)
+        with pytest.raises(RuntimeError):
+            self.run(monkeypatch, chapter_file, crashed)
+        sidecar = chapter_file.parent / "chapter_1_tagged.jsonl"
+        assert self.requested(crashed) == [1, 2, 3]
+        assert sidecar.exists()
+
+        resumed = FakeAsyncOpenAI()
+        output = self.run(monkeypatch, chapter_file, resumed)
+
+        assert self.requested(resumed) == list(range(4, 11))
+        assert not sidecar.exists()
+        data = json.loads(Path(output).read_text(encoding="utf-8"))
+        assert data["metadata"]["tagged"] is True
+        assert all(v["tags"] == ["duty", "action"] for v in data["verses"])
+
+    def test_reply_without_choices_fails_one_verse(self, chapter_file, monkeypatch):
+        """Test that a reply with null choices leaves that verse untagged only."""
+        client = FakeAsyncOpenAI(no_choices_for=["verse 2 about"])
+
+        output = self.run(monkeypatch, chapter_file, client)
+
+        verses = json.loads(Path(output).read_text(encoding="utf-8"))["verses"]
+        assert verses[1]["tags"] == []
+        assert all(v["tags"] == ["duty", "action"] for i, v in enumerate(verses) if i != 1)
+
+    def test_resume_ignores_truncated_line(self, chapter_file, monkeypatch):
+        """Test that a partial line from a crash mid-write is skipped."""
+        with pytest.raises(RuntimeError):
+            self.run(monkeypatch, chapter_file, FakeAsyncOpenAI(fail_after=2))
+        sidecar = chapter_file.parent / "chapter_1_tagged.jsonl"
+        with open(sidecar, 'a', encoding='utf-8') as f:
+            f.write('{"i": 2, "verse": "3", "ke')
+
+        resumed = FakeAsyncOpenAI()
+        self.run(monkeypatch, chapter_file, resumed)
+
+        assert self.requested(resumed) == list(range(3, 11))
+
+    def test_resume_retags_edited_verse(self, chapter_file, monkeypatch):
+        """Test that a verse edited between runs is not given stale tags."""
+        with pytest.raises(RuntimeError):
+            self.run(monkeypatch, chapter_file, FakeAsyncOpenAI(fail_after=3))
+
+        data = json.loads(chapter_file.read_text(encoding="utf-8"))
+        data["verses"][1]["translation"] = "Revised translation of verse 2 about duty and action."
+        chapter_file.write_text(json.dumps(data), encoding="utf-8")
+
+        resumed = FakeAsyncOpenAI()
+        self.run(monkeypatch, chapter_file, resumed)
+
+        assert self.requested(resumed) == [2, *range(4, 11)]
+
+
+@pytest.mark.integration
 class TestTagger:
     """Tests for tagger module."""
 
     def test_tagger_creation(self):
         """Test that tagger can be created."""
-        from src.tagger import VerseTagger
-
         tagger = VerseTagger()
         assert tagger is not None
 
     def test_tag_verse_returns_list(self):
         """Test that tag_verse returns a list."""
-        from src.tagger import VerseTagger
-
         tagger = VerseTagger()
         tags = tagger.tag_verse(
             "One must perform their duty without attachment.",
@@ -121,8 +315,6 @@ class TestTagger:
 
     def test_tags_are_strings(self):
         """Test that tags are strings."""
-        from src.tagger import VerseTagger
-
         tagger = VerseTagger()
         tags = tagger.tag_verse(
             "Control the mind and find peace.",
@@ -134,20 +326,17 @@ class TestTagger:
             assert len(tag) > 0
 
 
+@pytest.mark.integration
 class TestEmbeddings:
     """Tests for embeddings module."""
 
     def test_generator_creation(self):
         """Test that embeddings generator can be created."""
-        from src.embeddings import EmbeddingsGenerator
-
         generator = EmbeddingsGenerator()
         assert generator is not None
 
     def test_embedding_dimensions(self):
         """Test that embeddings have correct dimensions."""
-        from src.embeddings import EmbeddingsGenerator
-
         generator = EmbeddingsGenerator()
         embedding = generator.generate_embedding("Test text for embedding")
 
@@ -156,8 +345,6 @@ class TestEmbeddings:
 
     def test_embedding_values_are_floats(self):
         """Test that embedding values are floats."""
-        from src.embeddings import EmbeddingsGenerator
-
         generator = EmbeddingsGenerator()
         embedding = generator.generate_embedding("Another test")
 
@@ -165,64 +352,158 @@ class TestEmbeddings:
             assert isinstance(value, float)
 
 
+class FakeIndex:
+    """Stand-in for a Pinecone index that records upserted batches."""
+
+    def __init__(self, release=None, fail_on=None):
+        self.batches = []
+        self.release = release
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+
+    def upsert(self, vectors, namespace=""):
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        if self.fail_on is not None and any(v["id"] == self.fail_on for v in vectors):
+            raise RuntimeError("upsert failed")
+        with self.lock:
+            self.batches.append(vectors)
+
+
+class TestUpsertVectors:
+    """Tests for batched, parallel upserts (offline)."""
+
+    @staticmethod
+    def make_store(index):
+        """VectorStore wired to a fake index, skipping client setup."""
+        store = VectorStore.__new__(VectorStore)
+        store.index = index
+        return store
+
+    @staticmethod
+    def make_vectors(n):
+        return [{"id": f"v{i}", "values": [float(i)], "metadata": {"n": i}} for i in range(n)]
+
+    def test_upserts_every_vector_in_batches(self):
+        """Test that all vectors are sent, in batches of at most batch_size."""
+        index = FakeIndex()
+        vectors = self.make_vectors(23)
+
+        upserted = self.make_store(index).upsert_vectors(vectors, batch_size=5, max_parallel=2)
+
+        assert upserted == 23
+        assert sorted(len(b) for b in index.batches) == [3, 5, 5, 5, 5]
+        assert sorted(v["id"] for b in index.batches for v in b) == sorted(v["id"] for v in vectors)
+
+    def test_generator_input(self):
+        """Test that an unsized iterable is upserted in full."""
+        index = FakeIndex()
+
+        upserted = self.make_store(index).upsert_vectors(
+            (v for v in self.make_vectors(12)), batch_size=5
+        )
+
+        assert upserted == 12
+        assert len(index.batches) == 3
+
+    def test_in_flight_batches_are_bounded(self):
+        """Test that input is not consumed past max_parallel pending batches."""
+        release = threading.Event()
+        index = FakeIndex(release=release)
+        consumed = 0
+
+        def vectors():
+            nonlocal consumed
+            for v in self.make_vectors(100):
+                consumed += 1
+                yield v
+
+        store = self.make_store(index)
+        result = {}
+        worker = threading.Thread(
+            target=lambda: result.update(n=store.upsert_vectors(vectors(), batch_size=5, max_parallel=2))
+        )
+        worker.start()
+        time.sleep(0.2)
+        # Two batches in flight plus the one waiting to be submitted
+        assert consumed <= 15
+        release.set()
+        worker.join(timeout=5)
+
+        assert result["n"] == 100
+        assert consumed == 100
+
+    def test_pinecone_format_batch_passed_through(self):
+        """Test that vectors already in Pinecone format are not rebuilt."""
+        index = FakeIndex()
+        vectors = self.make_vectors(3)
+
+        self.make_store(index).upsert_vectors(vectors)
+
+        assert all(sent is original for sent, original in zip(index.batches[0], vectors))
+
+    def test_mixed_batch_is_rebuilt(self):
+        """Test that extra keys are dropped when any vector in a batch has them."""
+        index = FakeIndex()
+        vectors = self.make_vectors(3)
+        vectors[1]["text"] = "extra field"
+
+        self.make_store(index).upsert_vectors(vectors)
+
+        assert all(set(v) == {"id", "values", "metadata"} for v in index.batches[0])
+        assert "text" in vectors[1]
+
+    def test_batch_error_propagates(self):
+        """Test that a failed batch upsert raises instead of being dropped."""
+        index = FakeIndex(fail_on="v7")
+
+        with pytest.raises(RuntimeError, match="upsert failed"):
+            self.make_store(index).upsert_vectors(self.make_vectors(20), batch_size=5)
+
+
+@pytest.mark.integration
+@pytest.mark.xdist_group("pinecone")
 class TestVectorStore:
     """Tests for vector store module."""
 
     def test_vectorstore_creation(self):
         """Test that vector store can be created."""
-        from src.vectorstore import VectorStore
-
         store = VectorStore()
         assert store is not None
 
-    def test_index_stats(self):
+    def test_index_stats(self, vector_store):
         """Test that we can get index stats."""
-        from src.vectorstore import VectorStore
-
-        store = VectorStore()
-        stats = store.get_stats()
+        stats = vector_store.get_stats()
 
         assert "total_vectors" in stats
         assert "dimension" in stats
         assert stats["dimension"] == 1536
 
-    def test_vectors_uploaded(self):
+    def test_vectors_uploaded(self, vector_store):
         """Test that vectors are uploaded to Pinecone."""
-        from src.vectorstore import VectorStore
-
-        store = VectorStore()
-        stats = store.get_stats()
+        stats = vector_store.get_stats()
 
         assert stats["total_vectors"] == 47
 
-    def test_query_returns_results(self):
+    def test_query_returns_results(self, vector_store):
         """Test that query returns results."""
-        from src.vectorstore import VectorStore
-
-        store = VectorStore()
-        results = store.query("How to deal with fear?", top_k=3)
+        results = vector_store.query("How to deal with fear?", top_k=3)
 
         assert isinstance(results, list)
         assert len(results) == 3
 
-    def test_query_results_have_scores(self):
+    def test_query_results_have_scores(self, vector_store):
         """Test that query results have scores."""
-        from src.vectorstore import VectorStore
-
-        store = VectorStore()
-        results = store.query("What is duty?", top_k=2)
+        results = vector_store.query("What is duty?", top_k=2)
 
         for result in results:
             assert "id" in result
             assert "score" in result
             assert 0 <= result["score"] <= 1
 
-    def test_query_results_have_metadata(self):
+    def test_query_results_have_metadata(self, vector_store):
         """Test that query results have metadata."""
-        from src.vectorstore import VectorStore
-
-        store = VectorStore()
-        results = store.query("Finding peace", top_k=1)
+        results = vector_store.query("Finding peace", top_k=1)
 
         assert "metadata" in results[0]
         meta = results[0]["metadata"]
@@ -231,47 +512,37 @@ class TestVectorStore:
         assert "tags" in meta
 
 
+@pytest.mark.integration
+@pytest.mark.xdist_group("pinecone")
 class TestRetrievalQuality:
     """Tests for retrieval quality."""
 
-    def test_fear_query_returns_fear_tagged_verse(self):
+    def test_fear_query_returns_fear_tagged_verse(self, cached_store):
         """Test that fear query returns verse tagged with fear."""
-        from src.vectorstore import VectorStore
-
-        store = VectorStore()
-        results = store.query("How do I deal with anxiety and fear?", top_k=1)
+        results = cached_store.query("How do I deal with anxiety and fear?", top_k=1)
 
         top_result = results[0]
         tags = top_result["metadata"].get("tags", [])
 
         # Should match verse with fear/anxiety tags
-        assert any(tag in ["fear", "anxiety", "courage"] for tag in tags)
+        assert FEAR_TAGS.intersection(tags)
 
-    def test_duty_query_returns_duty_tagged_verse(self):
+    def test_duty_query_returns_duty_tagged_verse(self, cached_store):
         """Test that duty query returns verse tagged with duty."""
-        from src.vectorstore import VectorStore
-
-        store = VectorStore()
-        results = store.query("What is my duty in life?", top_k=1)
+        results = cached_store.query("What is my duty in life?", top_k=1)
 
         top_result = results[0]
         tags = top_result["metadata"].get("tags", [])
 
-        assert "duty" in tags or "dharma" in tags
+        assert DUTY_TAGS.intersection(tags)
 
-    def test_attachment_query_returns_relevant_verse(self):
+    def test_attachment_query_returns_relevant_verse(self, cached_store):
         """Test that attachment query returns relevant verse."""
-        from src.vectorstore import VectorStore
-
-        store = VectorStore()
-        results = store.query("How to overcome attachment?", top_k=3)
+        results = cached_store.query("How to overcome attachment?", top_k=3)
 
         # At least one result should have attachment-related tag
-        all_tags = []
-        for r in results:
-            all_tags.extend(r["metadata"].get("tags", []))
-
-        assert any(tag in ["attachment", "detachment", "renunciation", "surrender"] for tag in all_tags)
+        all_tags = {tag for r in results for tag in r["metadata"].get("tags", [])}
+        assert ATTACHMENT_TAGS & all_tags
 
 
 if __name__ == "__main__":
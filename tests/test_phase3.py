@@ -9,41 +9,59 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.retriever import Retriever, RetrievedVerse
 
+# Tags that count as a relevant hit in the retrieval quality tests
+FEAR_TAGS = frozenset({"fear", "anxiety", "courage", "sorrow", "peace"})
+DUTY_TAGS = frozenset({"duty", "dharma", "action", "karma"})
+ATTACHMENT_TAGS = frozenset({"attachment", "detachment", "surrender", "renunciation"})
+
+
+class TestRetrievedVerse:
+    """Tests for the RetrievedVerse dataclass (offline)."""
+
+    def make_verse(self, **kwargs):
+        """Verse built positionally, as callers did before tag_set existed."""
+        return RetrievedVerse(1, "47", "sanskrit", "translation", "commentary", ["Duty", "Karma"], 0.9, **kwargs)
+
+    def test_tag_set_derived_from_tags(self):
+        """Test that tag_set defaults to the lowercased tags."""
+        assert self.make_verse().tag_set == frozenset({"duty", "karma"})
+
+    def test_tag_set_not_in_repr_or_eq(self):
+        """Test that tag_set does not affect repr or equality."""
+        verse = self.make_verse(tag_set=frozenset({"other"}))
+
+        assert "tag_set" not in repr(verse)
+        assert verse == self.make_verse()
+
+
+# Tests below need Pinecone; all share one worker so the session
+# retriever is built once
+@pytest.mark.integration
+@pytest.mark.xdist_group("pinecone")
 class TestRetrieverCreation:
     """Tests for Retriever initialization."""
 
     def test_retriever_creation(self):
         """Test that retriever can be created."""
-        from src.retriever import Retriever
-
         retriever = Retriever()
         assert retriever is not None
 
-    def test_retriever_loads_verses(self):
+    def test_retriever_loads_verses(self, retriever):
         """Test that retriever loads verse data."""
-        from src.retriever import Retriever
-
-        retriever = Retriever()
         assert len(retriever.verses_data) == 47
 
-    def test_retriever_has_vector_store(self):
+    def test_retriever_has_vector_store(self, retriever):
         """Test that retriever has vector store."""
-        from src.retriever import Retriever
-
-        retriever = Retriever()
         assert retriever.vector_store is not None
 
 
+@pytest.mark.integration
+@pytest.mark.xdist_group("pinecone")
 class TestRetrieval:
     """Tests for verse retrieval."""
 
-    @pytest.fixture
-    def retriever(self):
-        """Create retriever fixture."""
-        from src.retriever import Retriever
-        return Retriever()
-
     def test_retrieve_returns_list(self, retriever):
         """Test that retrieve returns a list."""
         results = retriever.retrieve("How to deal with fear?")
@@ -62,8 +80,6 @@ class TestRetrieval:
 
     def test_retrieve_returns_retrieved_verse_objects(self, retriever):
         """Test that retrieve returns RetrievedVerse objects."""
-        from src.retriever import RetrievedVerse
-
         results = retriever.retrieve("How to overcome attachment?")
         assert len(results) > 0
         assert isinstance(results[0], RetrievedVerse)
@@ -93,15 +109,11 @@ class TestRetrieval:
         assert len(verse.tags) > 0
 
 
+@pytest.mark.integration
+@pytest.mark.xdist_group("pinecone")
 class TestContext:
     """Tests for context generation."""
 
-    @pytest.fixture
-    def retriever(self):
-        """Create retriever fixture."""
-        from src.retriever import Retriever
-        return Retriever()
-
     def test_get_context_returns_string(self, retriever):
         """Test that get_context returns a string."""
         context = retriever.get_context("How to deal with anxiety?")
@@ -140,62 +152,42 @@ class TestContext:
         assert "Commentary:" in context
 
 
+@pytest.mark.integration
+@pytest.mark.xdist_group("pinecone")
 class TestRetrievalQuality:
     """Tests for retrieval quality."""
 
-    @pytest.fixture
-    def retriever(self):
-        """Create retriever fixture."""
-        from src.retriever import Retriever
-        return Retriever()
-
     def test_fear_query_returns_relevant_verses(self, retriever):
         """Test that fear-related query returns relevant verses."""
         results = retriever.retrieve("I'm feeling anxious and afraid", top_k=3)
         assert len(results) > 0
 
-        all_tags = []
-        for r in results:
-            all_tags.extend(r.tags)
-
+        all_tags = {tag for r in results for tag in r.tags}
         # Should have some relevant tags
-        relevant_tags = ["fear", "anxiety", "courage", "sorrow", "peace"]
-        assert any(tag in all_tags for tag in relevant_tags)
+        assert FEAR_TAGS & all_tags
 
     def test_duty_query_returns_relevant_verses(self, retriever):
         """Test that duty-related query returns relevant verses."""
         results = retriever.retrieve("What should I do in life?", top_k=3)
         assert len(results) > 0
 
-        all_tags = []
-        for r in results:
-            all_tags.extend(r.tags)
-
-        relevant_tags = ["duty", "dharma", "action", "karma"]
-        assert any(tag in all_tags for tag in relevant_tags)
+        all_tags = {tag for r in results for tag in r.tags}
+        assert DUTY_TAGS & all_tags
 
     def test_attachment_query_returns_relevant_verses(self, retriever):
         """Test that attachment query returns relevant verses."""
         results = retriever.retrieve("I'm too attached to results", top_k=3)
         assert len(results) > 0
 
-        all_tags = []
-        for r in results:
-            all_tags.extend(r.tags)
-
-        relevant_tags = ["attachment", "detachment", "surrender", "renunciation"]
-        assert any(tag in all_tags for tag in relevant_tags)
+        all_tags = {tag for r in results for tag in r.tags}
+        assert ATTACHMENT_TAGS & all_tags
 
 
+@pytest.mark.integration
+@pytest.mark.xdist_group("pinecone")
 class TestTagRetrieval:
     """Tests for tag-based retrieval."""
 
-    @pytest.fixture
-    def retriever(self):
-        """Create retriever fixture."""
-        from src.retriever import Retriever
-        return Retriever()
-
     def test_get_all_tags(self, retriever):
         """Test that we can get all tags."""
         tags = retriever.get_all_tags()
@@ -208,7 +200,7 @@ class TestTagRetrieval:
         assert len(results) > 0
 
         for result in results:
-            assert "duty" in [t.lower() for t in result.tags]
+            assert "duty" in result.tag_set
 
     def test_retrieve_by_tag_respects_limit(self, retriever):
         """Test that retrieve_by_tag respects limit."""
@@ -216,15 +208,11 @@ class TestTagRetrieval:
         assert len(results) <= 2
 
 
+@pytest.mark.integration
+@pytest.mark.xdist_group("pinecone")
 class TestEdgeCases:
     """Tests for edge cases."""
 
-    @pytest.fixture
-    def retriever(self):
-        """Create retriever fixture."""
-        from src.retriever import Retriever
-        return Retriever()
-
     def test_empty_query(self, retriever):
         """Test handling of empty query."""
         results = retriever.retrieve("")